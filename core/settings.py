@@ -90,6 +90,9 @@ WSGI_APPLICATION = "core.wsgi.application"
 DATABASES = {}
 DATABASES["default"] = dj_database_url.parse(os.environ["DATABASE_URL"])
 
+CACHES = {}
+CACHES["default"] = env.cache("CACHE_URL", default="locmemcache://")
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -124,7 +127,11 @@ CRISPY_TEMPLATE_PACK = "bootstrap4"
 
 ELASTICSEARCH_DSL = {
     'default': {
-        'hosts': os.environ.get("ELASTICSEARCH_URL", False)
+        'hosts': os.environ.get("ELASTICSEARCH_URL", False),
+        # Compress request/response bodies, and keep enough pooled
+        # connections for each worker's threads.
+        'http_compress': True,
+        'maxsize': 25,
     },
 }
 
@@ -7,6 +7,11 @@ def get_profile(request):
     """
 
     if request.user.is_authenticated:
-        return {'profile': models.Profile.objects.filter(user=request.user).first()}
+        # The related object is cached on the user, so this queries at most
+        # once per request.
+        try:
+            return {'profile': request.user.profile}
+        except models.Profile.DoesNotExist:
+            return {'profile': None}
 
     return {'profile': False}
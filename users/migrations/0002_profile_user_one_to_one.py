@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def remove_duplicate_profiles(apps, schema_editor):
+    """
+    Keep the oldest profile for each user, so user can be made unique.
+    """
+    Profile = apps.get_model("users", "Profile")
+
+    seen = set()
+    duplicates = []
+    for pk, user_id in Profile.objects.order_by("pk").values_list("pk", "user_id"):
+        if user_id in seen:
+            duplicates.append(pk)
+        seen.add(user_id)
+
+    Profile.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_profiles, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='profile',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
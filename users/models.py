@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 
 
@@ -7,8 +9,20 @@ class Profile(models.Model):
     This is a user profile.
     """
 
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     dark_mode = models.BooleanField(default=False)
 
     def __str__(self):
         return self.user.username
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, **kwargs):
+    """
+    Create a profile alongside each new user.
+
+    Fixtures carry their own profiles, so raw saves are skipped.
+    """
+
+    if created and not kwargs.get("raw"):
+        Profile.objects.create(user=instance)
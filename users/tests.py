@@ -109,3 +109,15 @@ class RegistrationTestCase(TestCase):
         self.assertEqual(len(users), 0)
 
         self.assertContains(response, "Your passwords do not match")
+
+
+class ProfileTestCase(TestCase):
+    """
+    This tests profile creation.
+    """
+
+    def test_profile_created_with_user(self):
+        u = models.User.objects.create_user("foobar4")
+
+        self.assertIsInstance(u.profile, models.Profile)
+        self.assertEqual(models.Profile.objects.filter(user=u).count(), 1)
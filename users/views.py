@@ -3,7 +3,6 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import models as user_models
 from django.urls import reverse
 
-from . import models
 from . import forms
 
 
@@ -23,7 +22,7 @@ def profile(request, username):
     """
 
     user = get_object_or_404(user_models.User, username=username)
-    profile = models.Profile.objects.get(user=request.user)
+    profile = request.user.profile
 
     if request.method == "POST":
        profile_form = forms.ProfileForm(request.POST, instance=profile)
@@ -9,13 +9,14 @@ class PageHistoryFeed(Feed):
     description = "Changes and additions to the wiki."
 
     def items(self):
-        return Page.objects.order_by('-last_updated')[:30]
+        # Plain dicts of just the fields the feed uses; no model instances.
+        return Page.objects.order_by('-last_updated').values('path', 'content')[:30]
 
     def item_title(self, item):
-        return item.path
+        return item['path']
 
     def item_description(self, item):
-        return item.content
+        return item['content']
 
     def item_link(self, item):
-        return reverse('page', args=[item.path])
+        return reverse('page', args=[item['path']])
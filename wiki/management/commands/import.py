@@ -1,9 +1,11 @@
 import os
 
 from django.contrib.auth import models as user_models
+from django.core.cache import cache
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from loguru import logger
-from wiki.models import Page
+from wiki.models import PAGE_COUNT_CACHE_KEY, SIDEBAR_CACHE_KEY, Page, convert_markdown
 
 
 class Command(BaseCommand):
@@ -15,8 +17,24 @@ class Command(BaseCommand):
 
         user = user_models.User.objects.get(username="jonathan")
 
+        pages = []
         for filename in os.listdir("/logs/wiki/"):
             with open(os.path.join("/logs/wiki/", filename), "r") as f:
-                p = Page(user=user, path=filename.replace(".md", ""), content=f.read())
-                p.save()
-                logger.info(f"Created {p}.")
+                content = f.read()
+                pages.append(Page(
+                    last_edited_by=user,
+                    path=filename.replace(".md", ""),
+                    content=content,
+                    rendered_html=convert_markdown(content),
+                ))
+
+        # Insert in batches rather than one save() per page. This skips
+        # Page.save() and the post_save search indexing, so the HTML is
+        # rendered above, the caches the receivers would clear are cleared
+        # below, and the index needs rebuilding afterwards.
+        with transaction.atomic():
+            Page.objects.bulk_create(pages, batch_size=500)
+
+        cache.delete_many([SIDEBAR_CACHE_KEY, PAGE_COUNT_CACHE_KEY])
+
+        logger.info(f"Created {len(pages)} pages. Run 'search_index --rebuild' to index them.")
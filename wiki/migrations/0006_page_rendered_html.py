@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+from markdown import Markdown
+
+
+def render_pages(apps, schema_editor):
+    """
+    Fill rendered_html for existing pages.
+
+    The renderer is frozen here rather than imported from wiki.models, so
+    this migration keeps working if that code changes.
+    """
+    Page = apps.get_model("wiki", "Page")
+
+    md = Markdown(
+        extensions=["fenced_code", "nl2br", "wikilinks"],
+        extension_configs={"wikilinks": {"base_url": "/wiki/"}},
+    )
+
+    pages = []
+    for page in Page.objects.only("id", "content").iterator(chunk_size=500):
+        page.rendered_html = md.reset().convert(page.content) if page.content.strip() else ""
+        pages.append(page)
+
+        if len(pages) == 500:
+            Page.objects.bulk_update(pages, ["rendered_html"])
+            pages = []
+
+    Page.objects.bulk_update(pages, ["rendered_html"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0005_auto_20240712_1216'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='rendered_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_pages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-15 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0006_page_rendered_html'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='page',
+            index=models.Index(fields=['path', '-last_updated'], name='wiki_page_path_updated'),
+        ),
+    ]
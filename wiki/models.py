@@ -1,7 +1,87 @@
+import hashlib
+import threading
+
 from django.contrib.auth import models as user_models
+from django.core.cache import cache
 from django.db import models
-from markdown import markdown
-from markdown.extensions.wikilinks import WikiLinkExtension
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from markdown import Markdown
+
+# How long rendered HTML is kept in the cache, in seconds.
+RENDER_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Markdown extensions used to render pages.
+# See https://python-markdown.github.io/extensions/ for info.
+MARKDOWN_EXTENSIONS = ["fenced_code", "nl2br", "wikilinks"]
+MARKDOWN_EXTENSION_CONFIGS = {"wikilinks": {"base_url": "/wiki/"}}
+
+# The sidebar is an ordinary page, shown alongside every other page.
+SIDEBAR_PATH = "Sidebar"
+SIDEBAR_CACHE_KEY = "wiki:sidebar"
+
+# The cached number of page revisions, used to paginate the history.
+PAGE_COUNT_CACHE_KEY = "wiki:page_count"
+
+_local = threading.local()
+
+
+def _get_markdown():
+    """
+    This returns a Markdown instance for the current thread.
+
+    Building the extension pipeline is a large part of rendering a small
+    page, so each thread builds it once and resets it between documents.
+    """
+    if not hasattr(_local, "md"):
+        _local.md = Markdown(
+            extensions=MARKDOWN_EXTENSIONS,
+            extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+        )
+
+    return _local.md
+
+
+def convert_markdown(content):
+    """
+    This renders Markdown to HTML, without caching.
+    """
+    if not content or content.isspace():
+        return ""
+
+    return _get_markdown().reset().convert(content)
+
+
+def render_markdown(content):
+    """
+    This renders Markdown to HTML.
+
+    The result is cached against a hash of the content, so unchanged pages
+    are only rendered once and there is nothing to invalidate on edit.
+    """
+    if not content or content.isspace():
+        return ""
+
+    key = "wiki:md:" + hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+    html = cache.get(key)
+
+    if html is None:
+        html = convert_markdown(content)
+        cache.set(key, html, RENDER_CACHE_TIMEOUT)
+
+    return html
+
+
+class PageQuerySet(models.QuerySet):
+    """
+    Queries for pages.
+    """
+
+    def latest_for_path(self, path):
+        """
+        This returns the latest revision of a path, or None.
+        """
+        return self.filter(path=path).order_by("-last_updated").first()
 
 
 class Page(models.Model):
@@ -15,22 +95,28 @@ class Page(models.Model):
     last_edited_by = models.ForeignKey(user_models.User, on_delete=models.CASCADE)
     is_deprecated = models.BooleanField(default=False)
     is_deleted = models.BooleanField(default=False)
+    rendered_html = models.TextField(blank=True, editable=False)
+
+    objects = PageQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves "latest revision of this path" lookups, and path lookups.
+            models.Index(fields=["path", "-last_updated"], name="wiki_page_path_updated"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Render once on write, rather than on every view. The content has
+        # usually just changed, so this skips the render cache.
+        self.rendered_html = self.render
+        super().save(*args, **kwargs)
 
     @property
     def render(self):
         """
         This renders the content.
         """
-        # Render Markdown to HTML.
-        # See https://python-markdown.github.io/extensions/ for info.
-        return markdown(
-            self.content,
-            extensions=[
-                "fenced_code",
-                "nl2br",
-                WikiLinkExtension(base_url="/wiki/"),
-            ],
-        )
+        return convert_markdown(self.content)
 
 
 class FileUpload(models.Model):
@@ -42,3 +128,31 @@ class FileUpload(models.Model):
     def __str__(self):
         return self.file.name
 
+
+@receiver([post_save, post_delete], sender=Page)
+def invalidate_sidebar(sender, instance, **kwargs):
+    """
+    Drop the cached sidebar when it changes.
+    """
+
+    if instance.path == SIDEBAR_PATH:
+        cache.delete(SIDEBAR_CACHE_KEY)
+
+
+@receiver(post_save, sender=Page)
+def invalidate_page_count_on_save(sender, instance, created, **kwargs):
+    """
+    Drop the cached page count when a revision is added.
+    """
+
+    if created:
+        cache.delete(PAGE_COUNT_CACHE_KEY)
+
+
+@receiver(post_delete, sender=Page)
+def invalidate_page_count_on_delete(sender, instance, **kwargs):
+    """
+    Drop the cached page count when a revision is removed.
+    """
+
+    cache.delete(PAGE_COUNT_CACHE_KEY)
@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class CachedCountPaginator(Paginator):
+    """
+    A paginator which caches the total object count.
+
+    Counting a large table is the most expensive query behind a page of
+    results, and a slightly stale count is fine for page links.
+    """
+
+    def __init__(self, object_list, per_page, cache_key, cache_timeout=60, **kwargs):
+        self.cache_key = cache_key
+        self.cache_timeout = cache_timeout
+        super().__init__(object_list, per_page, **kwargs)
+
+    @cached_property
+    def count(self):
+        return cache.get_or_set(self.cache_key, self.object_list.count, self.cache_timeout)
+
+
+class PrimaryKeyPaginator(CachedCountPaginator):
+    """
+    A paginator which selects each page's rows by primary key.
+
+    The offset is applied to a narrow query of primary keys, so the
+    database only reads whole rows for the objects on the requested page.
+    """
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+
+        pks = self.object_list.values("pk")[bottom:top]
+        return self._get_page(self.object_list.filter(pk__in=pks), number, self)
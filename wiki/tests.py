@@ -1,3 +1,324 @@
-from django.test import TestCase
+import io
+import os
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import models as user_models
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from wiki import documents
+from wiki.models import PAGE_COUNT_CACHE_KEY, SIDEBAR_CACHE_KEY, SIDEBAR_PATH, Page, convert_markdown, render_markdown
+from wiki.paginators import CachedCountPaginator, PrimaryKeyPaginator
+from wiki.views import EDIT_HISTORY_LIMIT
+
+
+class TestRenderMarkdown:
+    def test_renders_markdown(self):
+        assert render_markdown("# Title") == '<h1>Title</h1>'
+
+    def test_renders_wikilinks(self):
+        assert 'href="/wiki/Sidebar/"' in render_markdown("[[Sidebar]]")
+
+    def test_empty_content(self):
+        assert render_markdown("") == ""
+        assert render_markdown("  \n\t") == ""
+
+
+class TestConvertMarkdown:
+    def test_renders_markdown(self):
+        assert convert_markdown("# Title") == '<h1>Title</h1>'
+
+    def test_empty_content(self):
+        assert convert_markdown("") == ""
+        assert convert_markdown("  \n\t") == ""
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class PageSaveTestCase(TestCase):
+    """
+    This tests rendering pages on save.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_renders_without_caching(self):
+        user = user_models.User.objects.create_user("editor")
+
+        with mock.patch("wiki.models.render_markdown") as cached_render:
+            page = Page.objects.create(path="index", content="# Title", last_edited_by=user)
+
+        self.assertEqual(page.rendered_html, "<h1>Title</h1>")
+        cached_render.assert_not_called()
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class SearchTestCase(TestCase):
+    """
+    This tests the search view.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = user_models.User.objects.create_user("searcher", password="buzzwiggle")
+        self.client.force_login(self.user)
+        self.page = Page.objects.create(path="hello", content="Hello world.", last_edited_by=self.user)
+
+    def mock_search(self):
+        patcher = mock.patch.object(documents.PageDocument, "search")
+        search = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        hits = [SimpleNamespace(meta=SimpleNamespace(id=str(self.page.pk)))]
+        search.return_value.query.return_value.source.return_value.__getitem__.return_value = hits
+        return search
+
+    def test_repeated_searches_query_elasticsearch_once(self):
+        search = self.mock_search()
+
+        for q in ["hello", "hello", "  HELLO "]:
+            response = self.client.get(reverse("search"), {"q": q})
+            self.assertContains(response, 'href="%s"' % reverse("page", args=["hello"]))
+
+        self.assertEqual(search.call_count, 1)
+
+    def test_short_query_skips_elasticsearch(self):
+        search = self.mock_search()
+
+        response = self.client.get(reverse("search"), {"q": "h"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(search.call_count, 0)
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class PaginatorTestCase(TestCase):
+    """
+    This tests the history paginators.
+    """
+
+    def setUp(self):
+        cache.clear()
+        user = user_models.User.objects.create_user("editor")
+        self.pages = [
+            Page.objects.create(path="page-%d" % i, content="Content.", last_edited_by=user)
+            for i in range(7)
+        ]
+
+    def paginate(self, **kwargs):
+        return PrimaryKeyPaginator(Page.objects.order_by("pk"), 3, cache_key="test:page_count", **kwargs)
+
+    def test_page_contents(self):
+        paginator = self.paginate()
+
+        self.assertEqual(paginator.num_pages, 3)
+        self.assertEqual(list(paginator.page(1)), self.pages[0:3])
+        self.assertEqual(list(paginator.page(2)), self.pages[3:6])
+        self.assertEqual(list(paginator.page(3)), self.pages[6:7])
+
+    def test_orphans(self):
+        paginator = self.paginate(orphans=1)
+
+        self.assertEqual(paginator.num_pages, 2)
+        self.assertEqual(list(paginator.page(2)), self.pages[3:7])
+
+    def test_out_of_range_pages(self):
+        paginator = self.paginate()
+
+        self.assertEqual(paginator.get_page(99).number, 3)
+        self.assertEqual(paginator.get_page(0).number, 3)
+        self.assertEqual(paginator.get_page("abc").number, 1)
+        self.assertEqual(list(paginator.get_page(99)), self.pages[6:7])
+
+    def test_count_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(CachedCountPaginator(Page.objects.all(), 3, cache_key="test:page_count").count, 7)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCountPaginator(Page.objects.all(), 3, cache_key="test:page_count").count, 7)
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class PageCountInvalidationTestCase(TestCase):
+    """
+    This tests that the cached page count is dropped when revisions change.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = user_models.User.objects.create_user("editor")
+        self.page = Page.objects.create(path="index", content="Content.", last_edited_by=self.user)
+        cache.set(PAGE_COUNT_CACHE_KEY, 1)
+
+    def test_dropped_on_create(self):
+        Page.objects.create(path="index", content="New content.", last_edited_by=self.user)
+
+        self.assertIsNone(cache.get(PAGE_COUNT_CACHE_KEY))
+
+    def test_dropped_on_delete(self):
+        self.page.delete()
+
+        self.assertIsNone(cache.get(PAGE_COUNT_CACHE_KEY))
+
+    def test_kept_on_update(self):
+        self.page.content = "Changed content."
+        self.page.save()
+
+        self.assertEqual(cache.get(PAGE_COUNT_CACHE_KEY), 1)
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class SidebarTestCase(TestCase):
+    """
+    This tests the cached sidebar shown alongside each page.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = user_models.User.objects.create_user("reader")
+        self.client.force_login(self.user)
+        Page.objects.create(path="index", content="Welcome.", last_edited_by=self.user)
+
+    def get_index(self):
+        return self.client.get(reverse("page", args=["index"]))
+
+    def test_placeholder_without_sidebar(self):
+        response = self.get_index()
+
+        self.assertContains(response, "<h1>Sidebar</h1>")
+        self.assertFalse(Page.objects.filter(path=SIDEBAR_PATH).exists())
+
+    def test_replaced_after_save(self):
+        self.get_index()
+
+        Page.objects.create(path=SIDEBAR_PATH, content="# Links", last_edited_by=self.user)
+        response = self.get_index()
+
+        self.assertContains(response, "<h1>Links</h1>")
+        self.assertNotContains(response, "<h1>Sidebar</h1>")
+
+    def test_cleared_on_delete(self):
+        sidebar = Page.objects.create(path=SIDEBAR_PATH, content="# Links", last_edited_by=self.user)
+        self.assertContains(self.get_index(), "<h1>Links</h1>")
+
+        sidebar.delete()
+
+        self.assertIsNone(cache.get(SIDEBAR_CACHE_KEY))
+        self.assertContains(self.get_index(), "<h1>Sidebar</h1>")
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class ImportTestCase(TestCase):
+    """
+    This tests the import command.
+    """
+
+    def setUp(self):
+        cache.set(SIDEBAR_CACHE_KEY, "<p>Old sidebar.</p>")
+        cache.set(PAGE_COUNT_CACHE_KEY, 0)
+        self.user = user_models.User.objects.create_user("jonathan")
+
+    def test_import(self):
+        files = {
+            "/logs/wiki/index.md": "# Welcome",
+            "/logs/wiki/Sidebar.md": "# Links",
+        }
+
+        # Only fake the import folder; Django lists and opens other files.
+        listdir, open_ = os.listdir, open
+
+        def fake_listdir(path="."):
+            return [os.path.basename(f) for f in files] if path == "/logs/wiki/" else listdir(path)
+
+        def fake_open(path, *args, **kwargs):
+            return io.StringIO(files[path]) if path in files else open_(path, *args, **kwargs)
+
+        with mock.patch("os.listdir", fake_listdir), mock.patch("builtins.open", fake_open):
+            call_command("import")
+
+        pages = {page.path: page for page in Page.objects.all()}
+        self.assertEqual(set(pages), {"index", "Sidebar"})
+        self.assertEqual(pages["index"].last_edited_by, self.user)
+        self.assertEqual(pages["index"].rendered_html, "<h1>Welcome</h1>")
+        self.assertEqual(pages["Sidebar"].rendered_html, "<h1>Links</h1>")
+
+        self.assertIsNone(cache.get(SIDEBAR_CACHE_KEY))
+        self.assertIsNone(cache.get(PAGE_COUNT_CACHE_KEY))
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class HistoryTestCase(TestCase):
+    """
+    This tests the history view.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(user_models.User.objects.create_user("reader"))
+
+        for name in ["alice", "bob", "carol"]:
+            editor = user_models.User.objects.create_user(name)
+            for i in range(3):
+                Page.objects.create(path="%s-%d" % (name, i), content="Content.", last_edited_by=editor)
+
+    def test_editors_are_not_fetched_per_row(self):
+        # Session, user, profile, page count, one page of revisions, their editors.
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse("history"))
+
+        for name in ["alice", "bob", "carol"]:
+            self.assertContains(response, "updated by %s" % name)
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class EditTestCase(TestCase):
+    """
+    This tests the edit view.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = user_models.User.objects.create_user("editor")
+        self.client.force_login(self.user)
+
+        # Space the revisions out, so their order doesn't rest on save timing.
+        start = timezone.now() - timedelta(days=1)
+        self.revisions = []
+        for i in range(EDIT_HISTORY_LIMIT + 5):
+            page = Page.objects.create(path="index", content="Revision %d." % i, last_edited_by=self.user)
+            Page.objects.filter(pk=page.pk).update(last_updated=start + timedelta(minutes=i))
+            self.revisions.append(page)
+
+    def test_form_is_bound_to_latest_revision(self):
+        response = self.client.get(reverse("edit", args=["index"]))
+
+        form = response.context["form"]
+        self.assertEqual(form.instance, self.revisions[-1])
+        self.assertEqual(form.initial["content"], "Revision %d." % (EDIT_HISTORY_LIMIT + 4))
+
+    def test_history_is_newest_first_and_limited(self):
+        response = self.client.get(reverse("edit", args=["index"]))
+
+        expected = self.revisions[::-1][:EDIT_HISTORY_LIMIT]
+        self.assertEqual(list(response.context["history"]), expected)
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class FeedTestCase(TestCase):
+    """
+    This tests the history feed.
+    """
+
+    def test_items(self):
+        user = user_models.User.objects.create_user("editor")
+        Page.objects.create(path="release-notes", content="Notes.", last_edited_by=user)
+
+        response = self.client.get("/wiki/feed/")
+
+        self.assertContains(response, "<title>release-notes</title>")
+        self.assertContains(response, "<link>http://testserver/wiki/release-notes/</link>")
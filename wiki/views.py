@@ -1,12 +1,45 @@
+import hashlib
+
+from django.contrib.auth import models as user_models
+from django.core.cache import cache
+from django.db.models import Prefetch
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse
 from django.http import HttpResponseForbidden, JsonResponse, HttpResponse
-from django.core.paginator import Paginator
 from django.views.decorators.http import require_http_methods
 from wiki.models import FileUpload
 
 from . import models, forms, documents
+from .paginators import PrimaryKeyPaginator
+
+# How long the sidebar is cached for, in seconds. Saving the sidebar clears
+# it straight away; this bounds staleness for per-process cache backends.
+SIDEBAR_CACHE_TIMEOUT = 300
+
+# The most revisions listed on the edit page.
+EDIT_HISTORY_LIMIT = 20
+
+# The shortest query that is sent to Elasticsearch, and the most results
+# shown for one.
+SEARCH_MIN_QUERY_LENGTH = 2
+SEARCH_RESULTS_LIMIT = 20
+
+# How long the hits for a query are cached for, in seconds.
+SEARCH_CACHE_TIMEOUT = 60
+
+
+def get_sidebar_html():
+    """
+    This returns the sidebar's HTML, or a placeholder if there is no sidebar.
+    """
+
+    sidebar = models.Page.objects.only("rendered_html").latest_for_path(models.SIDEBAR_PATH)
+
+    if sidebar is None:
+        return models.render_markdown("# Sidebar")
+
+    return sidebar.rendered_html
 
 
 @login_required
@@ -16,29 +49,22 @@ def page(request, path="index", specific_id=False):
     """
 
     # Get the sidebar.
-    try:
-        sidebar = models.Page.objects.filter(path="Sidebar").order_by("-last_updated")[0]
-    except (models.Page.DoesNotExist, IndexError):
-        sidebar = models.Page(
-            path="Sidebar",
-            content="# Sidebar",
-            last_edited_by=request.user
-        )
-        sidebar.save()
+    sidebar_html = cache.get_or_set(models.SIDEBAR_CACHE_KEY, get_sidebar_html, SIDEBAR_CACHE_TIMEOUT)
 
     # Get the page.
-    try:
-        if specific_id:
-            page = models.Page.objects.get(path=path, id=specific_id)
-        else:
-            page = models.Page.objects.filter(path=path).order_by("-last_updated")[0]
+    # The template shows the stored HTML, so skip the Markdown source.
+    pages = models.Page.objects.select_related("last_edited_by").defer("content")
+    if specific_id:
+        page = pages.filter(path=path, id=specific_id).first()
+    else:
+        page = pages.latest_for_path(path)
 
     # If there is no page, then we will send them to the PageForm.
-    except (models.Page.DoesNotExist, IndexError):
+    if page is None:
         return redirect(reverse("edit", kwargs={'path': path}))
 
     return render(request, "wiki/page.html", {
-        'sidebar': sidebar,
+        'sidebar_html': sidebar_html,
         'page': page,
     })
 
@@ -49,14 +75,16 @@ def edit(request, path):
     This is the edit page.
     """
 
-    # Get all revisions.
-    history = models.Page.objects.filter(path=path)
+    # Get the latest revisions, newest first, in one query.
+    history = list(
+        models.Page.objects.filter(path=path).select_related("last_edited_by").order_by("-last_updated")[:EDIT_HISTORY_LIMIT]
+    )
 
-    # Get the page.
-    try:
-        page = models.Page.objects.filter(path=path).order_by("-last_updated")[0]
+    # The page is the latest revision.
+    if history:
+        page = history[0]
     # If there is no page, then create a stub.
-    except (models.Page.DoesNotExist, IndexError):
+    else:
         page = models.Page(
             path=path,
             content="This page is empty.",
@@ -89,6 +117,16 @@ def remove_file(request, file_id):
     return JsonResponse({'success': False})
 
 
+def search_page_ids(query):
+    """
+    This returns the ids of the pages matching a query, best match first.
+    """
+
+    # Hits are only used for their ids, so don't return their source.
+    page_search = documents.PageDocument.search().query("match", content=query).source(False)
+
+    return [int(hit.meta.id) for hit in page_search[:SEARCH_RESULTS_LIMIT]]
+
 
 @login_required
 def search(request):
@@ -96,9 +134,21 @@ def search(request):
     if not "q" in request.GET:
         return HttpResponseForbidden()
 
-    query = request.GET['q']
+    query = request.GET['q'].strip()
+
+    # Don't send Elasticsearch queries too short to be useful.
+    if len(query) < SEARCH_MIN_QUERY_LENGTH:
+        results = []
+    else:
+        # Hits don't depend on who is searching, so cache them per query.
+        # Matching is case-insensitive, so normalise case and whitespace.
+        normalised = " ".join(query.lower().split())
+        key = "wiki:search:" + hashlib.blake2b(normalised.encode(), digest_size=16).hexdigest()
+        ids = cache.get_or_set(key, lambda: search_page_ids(normalised), SEARCH_CACHE_TIMEOUT)
 
-    results = documents.PageDocument.search().filter("term", content=query)
+        # Keep the pages in the order Elasticsearch ranked them.
+        pages = models.Page.objects.in_bulk(ids)
+        results = [pages[pk] for pk in ids if pk in pages]
 
     return render(request, "wiki/search.html", {
         'query': query,
@@ -112,8 +162,14 @@ def history(request):
     This shows the history across all pages.
     """
 
-    objects = models.Page.objects.all().order_by("-last_updated")
-    paginator = Paginator(objects, 15)
+    # Only the columns the listing shows; content can be large.
+    # Editors repeat across rows, so fetch each one once rather than joining.
+    objects = models.Page.objects.only(
+        "path", "last_updated", "last_edited_by",
+    ).prefetch_related(
+        Prefetch("last_edited_by", queryset=user_models.User.objects.only("id", "username")),
+    ).order_by("-last_updated")
+    paginator = PrimaryKeyPaginator(objects, 15, cache_key=models.PAGE_COUNT_CACHE_KEY)
 
     page_number = request.GET.get('page') or 1
     items = paginator.get_page(page_number)